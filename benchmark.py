@@ -2,15 +2,24 @@
 """MetaSSR Benchmark Suite - Simple Performance Testing"""
 
 import argparse
+import atexit
+import hashlib
+import http.client
 import json
 import os
 import platform
 import re
+import shutil
+import socket
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
+from urllib.parse import urlparse
 
 # Colors for terminal output
 class Colors:
@@ -24,44 +33,114 @@ def log(msg): print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}")
 def error(msg): print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}", file=sys.stderr)
 def success(msg): print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}")
 
-# Test scenarios: (name, threads, connections, duration)
+# Test scenarios: (name, threads, connections, duration, group)
+# A group can run on its own server, alongside the rest, via --parallel-scenarios
 SCENARIOS = [
-    ("Light",  1,  10,  20),
-    ("Medium", 4,  50,  40),
-    ("Heavy",  8,  200, 80),
-    ("Stress", 12, 500, 120),
+    ("Light",  1,  10,  20,  "low"),
+    ("Medium", 4,  50,  40,  "low"),
+    ("Heavy",  8,  200, 80,  "high"),
+    ("Stress", 12, 500, 120, "high"),
 ]
 
+# wrk output patterns
+_RE_LAT = re.compile(rb'Latency\s+([\d.]+\w+)')
+_RE_ERRS = re.compile(rb'Socket errors:.*?(\d+)')
+_RE_LATVAL = re.compile(r'([\d.]+)(\w+)')
+
+# Latency unit -> milliseconds multiplier
+_UNIT_MS = {"us": 1e-3, "ms": 1.0, "s": 1000.0}
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+SYSINFO_CACHE_DIR = Path.home() / ".cache" / "metassr-bench"
+
 def check_deps():
     """Check required dependencies"""
     missing = []
-    for dep in ["wrk", "curl"]:
-        if subprocess.run(["which", dep], capture_output=True).returncode != 0:
+    for dep in ["wrk"]:
+        if shutil.which(dep) is None:
             missing.append(dep)
     if missing:
         error(f"Missing: {', '.join(missing)}")
-        print("Install with: sudo apt-get install wrk curl")
+        print("Install with: sudo apt-get install wrk")
         sys.exit(1)
 
 def wait_for_server(url, timeout=30):
-    """Wait for server to be ready"""
+    """Wait for server to accept TCP connections"""
     log(f"Waiting for server at {url}...")
-    for _ in range(timeout):
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
         try:
-            result = subprocess.run(
-                ["curl", "-s", "--max-time", "2", url],
-                capture_output=True
-            )
-            if result.returncode == 0:
-                return True
-        except:
-            pass
-        time.sleep(1)
+            socket.create_connection((parsed.hostname, port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(max(0, min(delay, deadline - time.monotonic())))
+            delay = min(delay * 1.5, 1.0)
     error("Server not responding")
     return False
 
+def warmup(url, requests=32, connections=4):
+    """Warm up the server over a small pool of keep-alive connections"""
+    parsed = urlparse(url)
+    conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    path = parsed.path or "/"
+    
+    def worker(count):
+        conn = conn_cls(parsed.hostname, parsed.port, timeout=5)
+        try:
+            for _ in range(count):
+                conn.request("GET", path)
+                conn.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+    
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(worker, [requests // connections] * connections))
+
+def _listening_socket_inode(port):
+    """Find the inode of the socket listening on a TCP port"""
+    suffix = f":{port:04X}"
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    parts = line.split()
+                    if parts[1].endswith(suffix) and parts[3] == "0A":  # 0A = LISTEN
+                        return parts[9]
+        except OSError:
+            pass
+    return None
+
 def get_server_pid(port):
     """Get PID of server running on given port"""
+    if platform.system() == "Linux":
+        inode = _listening_socket_inode(port)
+        if inode is None:
+            return None
+        target = f"socket:[{inode}]"
+        # Numeric entries under /proc are always PID directories, so no stat is needed
+        with os.scandir("/proc") as procs:
+            for proc in procs:
+                pid = proc.name
+                if not "0" <= pid[0] <= "9":
+                    continue
+                try:
+                    with os.scandir(f"/proc/{pid}/fd") as fds:
+                        for fd in fds:
+                            try:
+                                if os.readlink(fd.path) == target:
+                                    return int(pid)
+                            except OSError:
+                                pass
+                except OSError:
+                    pass
+        return None
     try:
         result = subprocess.run(
             ["lsof", "-ti", f":{port}"],
@@ -73,45 +152,97 @@ def get_server_pid(port):
         pass
     return None
 
-def get_memory_usage(pid):
-    """Get memory usage in MB for a process"""
+# Cached /proc/<pid>/statm descriptors, reused across memory samples
+_statm_fds = {}
+PAGE_SIZE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _close_statm_fds():
+    for fd in _statm_fds.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    _statm_fds.clear()
+
+atexit.register(_close_statm_fds)
+
+def _linux_memory_usage(pid):
+    """Get memory usage in MB for a process from /proc/<pid>/statm"""
     if not pid:
         return 0
     try:
-        if platform.system() == "Linux":
-            with open(f"/proc/{pid}/status") as f:
-                for line in f:
-                    if line.startswith("VmRSS:"):
-                        return int(line.split()[1]) / 1024  # KB to MB
-        elif platform.system() == "Darwin":
-            result = subprocess.run(
-                ["ps", "-o", "rss=", "-p", str(pid)],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                return int(result.stdout.strip()) / 1024  # KB to MB
+        fd = _statm_fds.get(pid)
+        if fd is None:
+            fd = _statm_fds[pid] = os.open(f"/proc/{pid}/statm", os.O_RDONLY)
+        try:
+            buf = os.pread(fd, 64, 0)  # RSS is the second field, well within 64 bytes
+        except OSError:
+            # Process went away; drop the stale descriptor
+            os.close(_statm_fds.pop(pid))
+            raise
+        rss_pages = int(buf.split()[1])
+        return rss_pages * PAGE_SIZE_BYTES / 1024 / 1024  # pages to MB
+    except:
+        pass
+    return 0
+
+def _darwin_memory_usage(pid):
+    """Get memory usage in MB for a process via ps"""
+    if not pid:
+        return 0
+    try:
+        result = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(pid)],
+            capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            return int(result.stdout.strip()) / 1024  # KB to MB
     except:
         pass
     return 0
 
+def _unsupported_memory_usage(pid):
+    return 0
+
+# Pick the memory reader once; it runs on every background sample
+if sys.platform.startswith("linux"):
+    get_memory_usage = _linux_memory_usage
+elif sys.platform == "darwin":
+    get_memory_usage = _darwin_memory_usage
+else:
+    get_memory_usage = _unsupported_memory_usage
+
+class MemSampler(threading.Thread):
+    """Track peak memory of a process by sampling it in the background"""
+
+    def __init__(self, pid, interval=0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = get_memory_usage(pid)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, get_memory_usage(self.pid))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, get_memory_usage(self.pid))
+
 def parse_latency_ms(latency_str):
     """Convert latency string to milliseconds"""
     if not latency_str:
         return 0
-    match = re.match(r'([\d.]+)(\w+)', latency_str)
+    match = _RE_LATVAL.match(latency_str)
     if not match:
         return 0
     value, unit = float(match.group(1)), match.group(2).lower()
-    if unit == 'us':
-        return value / 1000
-    elif unit == 'ms':
-        return value
-    elif unit == 's':
-        return value * 1000
-    return value
+    return value * _UNIT_MS.get(unit, 1.0)
 
 def parse_wrk_output(output):
-    """Parse wrk output and extract metrics"""
+    """Parse raw (bytes) wrk output and extract metrics"""
     result = {
         "rps": 0,
         "latency": "0ms",
@@ -122,32 +253,25 @@ def parse_wrk_output(output):
         "errors": 0
     }
     
-    # Requests/sec
-    match = re.search(r'Requests/sec:\s+([\d.]+)', output)
-    if match:
-        result["rps"] = float(match.group(1))
-    
-    # Average latency
-    match = re.search(r'Latency\s+([\d.]+\w+)', output)
-    if match:
-        result["latency"] = match.group(1)
-        result["latency_ms"] = parse_latency_ms(match.group(1))
-    
-    # P99 latency
-    match = re.search(r'99%\s+([\d.]+\w+)', output)
-    if match:
-        result["p99"] = match.group(1)
-        result["p99_ms"] = parse_latency_ms(match.group(1))
-    
-    # Total requests
-    match = re.search(r'(\d+)\s+requests in', output)
-    if match:
-        result["requests"] = int(match.group(1))
-    
-    # Socket errors
-    match = re.search(r'Socket errors:.*?(\d+)', output)
-    if match:
-        result["errors"] = int(match.group(1))
+    for line in output.splitlines():
+        s = line.lstrip()
+        if s.startswith(b"Requests/sec:"):
+            result["rps"] = float(s.split()[1])
+        elif s.startswith(b"Latency "):
+            # Average latency; also skips the "Latency Distribution" header
+            match = _RE_LAT.match(s)
+            if match and result["latency"] == "0ms":
+                result["latency"] = match.group(1).decode()
+                result["latency_ms"] = parse_latency_ms(result["latency"])
+        elif s.startswith(b"99%"):
+            result["p99"] = s.split()[1].decode()
+            result["p99_ms"] = parse_latency_ms(result["p99"])
+        elif b"requests in" in s:
+            result["requests"] = int(s.split()[0])
+        elif s.startswith(b"Socket errors:"):
+            match = _RE_ERRS.search(s)
+            if match:
+                result["errors"] = int(match.group(1))
     
     return result
 
@@ -155,14 +279,24 @@ def run_test(name, threads, connections, duration, url, server_pid):
     """Run a single benchmark test"""
     print(f"{Colors.YELLOW}[{name}]{Colors.NC} threads={threads} connections={connections} duration={duration}s")
     
-    mem_before = get_memory_usage(server_pid)
+    sampler = MemSampler(server_pid)
+    sampler.start()
     
-    cmd = ["wrk", f"-t{threads}", f"-c{connections}", f"-d{duration}s", "--latency", url]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    output = result.stdout + result.stderr
+    # Absolute path + close_fds=False lets subprocess launch wrk via posix_spawn
+    wrk = shutil.which("wrk") or "wrk"
+    cmd = [wrk, f"-t{threads}", f"-c{connections}", f"-d{duration}s", "--latency", url]
+    lines = []
+    try:
+        # stderr is folded into stdout so the output arrives as one stream
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              close_fds=False) as proc:
+            for line in proc.stdout:
+                lines.append(line)
+    finally:
+        sampler.stop()
+    output = b"".join(lines)
     
-    mem_after = get_memory_usage(server_pid)
-    mem_peak = max(mem_before, mem_after)
+    mem_peak = sampler.peak
     
     metrics = parse_wrk_output(output)
     metrics["memory_mb"] = round(mem_peak, 1)
@@ -171,37 +305,32 @@ def run_test(name, threads, connections, duration, url, server_pid):
     
     return {
         "name": name,
+        "server": url,
         "threads": threads,
         "connections": connections,
         "duration": duration,
         **metrics
     }
 
-def get_system_info():
-    """Collect system information"""
-    info = {
-        "os": platform.system(),
-        "os_version": platform.release(),
-        "arch": platform.machine(),
-        "python": platform.python_version(),
-        "cpu": "Unknown",
-        "cpu_cores": os.cpu_count() or 0,
-        "memory_gb": 0
-    }
+def read_hardware_info():
+    """Read CPU model and total memory, which are fixed per host"""
+    # compare.py has an identical copy; both fill the shared sysinfo cache
+    hw = {"cpu": "Unknown", "memory_gb": 0}
     
     # Get CPU info
     try:
         if platform.system() == "Linux":
+            # The first processor block is enough; the rest repeat it
             with open("/proc/cpuinfo") as f:
                 for line in f:
-                    if "model name" in line:
-                        info["cpu"] = line.split(":")[1].strip()
+                    if line.startswith("model name"):
+                        hw["cpu"] = line.split(":", 1)[1].strip()
                         break
         elif platform.system() == "Darwin":
             result = subprocess.run(["sysctl", "-n", "machdep.cpu.brand_string"], 
                                    capture_output=True, text=True)
             if result.returncode == 0:
-                info["cpu"] = result.stdout.strip()
+                hw["cpu"] = result.stdout.strip()
     except:
         pass
     
@@ -210,45 +339,145 @@ def get_system_info():
         if platform.system() == "Linux":
             with open("/proc/meminfo") as f:
                 for line in f:
-                    if "MemTotal" in line:
+                    if line.startswith("MemTotal:"):
                         kb = int(line.split()[1])
-                        info["memory_gb"] = round(kb / 1024 / 1024, 1)
+                        hw["memory_gb"] = round(kb / 1024 / 1024, 1)
                         break
         elif platform.system() == "Darwin":
             result = subprocess.run(["sysctl", "-n", "hw.memsize"], 
                                    capture_output=True, text=True)
             if result.returncode == 0:
-                info["memory_gb"] = round(int(result.stdout.strip()) / 1024 / 1024 / 1024, 1)
+                hw["memory_gb"] = round(int(result.stdout.strip()) / 1024 / 1024 / 1024, 1)
     except:
         pass
     
+    return hw
+
+def valid_hardware_info(hw):
+    """Check that a cached sysinfo entry has the shape read_hardware_info returns"""
+    return (isinstance(hw, dict) and hw.keys() == {"cpu", "memory_gb"}
+            and isinstance(hw["cpu"], str) and isinstance(hw["memory_gb"], (int, float)))
+
+def parse_group_target(value):
+    """Parse a GROUP=URL argument naming the server a scenario group runs against"""
+    groups = sorted({s[4] for s in SCENARIOS})
+    group, sep, url = value.partition("=")
+    if not sep or group not in groups or urlparse(url).port is None:
+        raise argparse.ArgumentTypeError(
+            f"expected GROUP=URL with GROUP in {', '.join(groups)} and an explicit port, got {value!r}")
+    return group, url
+
+def run_scenarios(url, server_pid, group_targets=None):
+    """Run all scenarios, co-running groups that have their own server
+    
+    Scenarios of a group in group_targets run in order against that group's
+    (url, pid); the rest run in order against url. Lanes run concurrently
+    and share this machine's CPUs for wrk, so their results are marked co_run.
+    """
+    group_targets = group_targets or {}
+    targets = {None: (url, server_pid), **group_targets}
+    lanes = {}
+    for i, scenario in enumerate(SCENARIOS):
+        group = scenario[4] if scenario[4] in group_targets else None
+        lanes.setdefault(group, []).append((i, scenario))
+    
+    def run_lane(group):
+        lane_url, lane_pid = targets[group]
+        return [
+            (i, run_test(name, threads, connections, duration, lane_url, lane_pid))
+            for i, (name, threads, connections, duration, _) in lanes[group]
+        ]
+    
+    with ThreadPoolExecutor(max_workers=len(lanes)) as pool:
+        done = [item for lane in pool.map(run_lane, lanes) for item in lane]
+    results = [r for _, r in sorted(done, key=itemgetter(0))]
+    for r in results:
+        r["co_run"] = len(lanes) > 1
+    return results
+
+def get_system_info():
+    """Collect system information, reusing cached hardware info for this host"""
+    # Cores this process may run on, matching what compare.py reports
+    if hasattr(os, "sched_getaffinity"):
+        cpu_cores = len(os.sched_getaffinity(0))
+    else:
+        cpu_cores = os.cpu_count() or 0
+    info = {
+        "os": platform.system(),
+        "os_version": platform.release(),
+        "arch": platform.machine(),
+        "python": platform.python_version(),
+        "cpu": "Unknown",
+        "cpu_cores": cpu_cores,
+        "memory_gb": 0
+    }
+    
+    key = hashlib.sha1((platform.node() + platform.release()).encode()).hexdigest()
+    cache_file = SYSINFO_CACHE_DIR / f"sysinfo-{key}.json"
+    try:
+        hw = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        hw = None
+    if not valid_hardware_info(hw):
+        hw = read_hardware_info()
+        if hw["cpu"] != "Unknown":
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(hw))
+            except OSError:
+                pass
+    info.update(hw)
+    
     return info
 
+# Numeric result fields summarized across scenarios
+AGG_FIELDS = ("rps", "latency_ms", "p99_ms", "memory_mb", "requests", "errors")
+
+def aggregate(results):
+    """Summarize each numeric field across results as min/max/sum/avg"""
+    # Transpose rows into per-field columns so min/max/sum run as builtins
+    columns = zip(*map(itemgetter(*AGG_FIELDS), results))
+    agg = {}
+    for k, col in zip(AGG_FIELDS, columns):
+        total = sum(col)
+        agg[k] = {"min": min(col), "max": max(col), "sum": total, "avg": total / len(col)}
+    return agg
+
 def generate_summary(results, output_dir, server_url, system_info):
     """Generate markdown summary with Mermaid charts"""
-    # Build chart data
-    labels = ", ".join(f'"{r["name"]}"' for r in results)
-    rps_values = ", ".join(str(int(r["rps"])) for r in results)
-    latency_values = ", ".join(f'{r["latency_ms"]:.2f}' for r in results)
-    p99_values = ", ".join(f'{r["p99_ms"]:.2f}' for r in results)
-    memory_values = ", ".join(str(r["memory_mb"]) for r in results)
-    requests_values = ", ".join(str(r["requests"]) for r in results)
+    # Build chart data in a single pass over the results
+    labels, rps, latency, p99, memory, requests = [], [], [], [], [], []
+    for r in results:
+        labels.append(f'"{r["name"]}"')
+        rps.append(str(int(r["rps"])))
+        latency.append(f'{r["latency_ms"]:.2f}')
+        p99.append(f'{r["p99_ms"]:.2f}')
+        memory.append(str(r["memory_mb"]))
+        requests.append(str(r["requests"]))
+    labels = ", ".join(labels)
+    rps_values = ", ".join(rps)
+    latency_values = ", ".join(latency)
+    p99_values = ", ".join(p99)
+    memory_values = ", ".join(memory)
+    requests_values = ", ".join(requests)
+    
+    agg = aggregate(results)
     
     # Calculate max values for chart scaling (with 20% padding)
-    max_rps = int(max((r["rps"] for r in results), default=100) * 1.2)
-    max_latency = max((r["latency_ms"] for r in results), default=1) * 1.2
-    max_p99 = max((r["p99_ms"] for r in results), default=1) * 1.2
-    max_memory = max((r["memory_mb"] for r in results), default=100) * 1.2
-    max_requests = int(max((r["requests"] for r in results), default=1000) * 1.2)
+    max_rps = int(agg["rps"]["max"] * 1.2)
+    max_latency = agg["latency_ms"]["max"] * 1.2
+    max_p99 = agg["p99_ms"]["max"] * 1.2
+    max_memory = agg["memory_mb"]["max"] * 1.2
+    max_requests = int(agg["requests"]["max"] * 1.2)
     
     # Find best result
     best = max(results, key=lambda r: r["rps"])
     
     # Check for errors
-    total_errors = sum(r["errors"] for r in results)
+    total_errors = agg["errors"]["sum"]
     error_status = "PASSED - All tests completed successfully" if total_errors == 0 else f"WARNING - {total_errors} errors detected"
     
-    summary = f"""# MetaSSR Benchmark Results
+    parts = [f"""# MetaSSR Benchmark Results
 
 **Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
 **Server:** {server_url}  
@@ -315,28 +544,39 @@ xychart-beta
 
 | Test | RPS | Avg Latency | P99 Latency | Memory | Requests | Errors |
 |------|-----|-------------|-------------|--------|----------|--------|
-"""
+"""]
     
     for r in results:
         error_cell = f"FAIL ({r['errors']})" if r['errors'] > 0 else "OK"
-        summary += f"| {r['name']} | {int(r['rps']):,} | {r['latency']} | {r['p99']} | {r['memory_mb']:.1f} MB | {r['requests']:,} | {error_cell} |\n"
-    
-    summary += f"""
+        name = f"{r['name']} (co-run)" if r.get("co_run") else r['name']
+        parts.append(f"| {name} | {int(r['rps']):,} | {r['latency']} | {r['p99']} | {r['memory_mb']:.1f} MB | {r['requests']:,} | {error_cell} |\n")
+    
+    co_run = [r for r in results if r.get("co_run")]
+    if co_run:
+        servers = ", ".join(sorted({r["server"] for r in co_run}))
+        parts.append(f"""
+> **Note:** Scenarios marked (co-run) ran concurrently against {servers},
+> with every wrk process on the same client machine. They contend for its CPUs,
+> so their numbers are not comparable to serial runs.
+""")
+    
+    parts.append(f"""
 ## Summary
 
 | Metric | Best | Average | Worst |
 |--------|------|---------|-------|
-| RPS | {max(r['rps'] for r in results):,.0f} | {sum(r['rps'] for r in results)/len(results):,.0f} | {min(r['rps'] for r in results):,.0f} |
-| Latency | {min(r['latency_ms'] for r in results):.2f}ms | {sum(r['latency_ms'] for r in results)/len(results):.2f}ms | {max(r['latency_ms'] for r in results):.2f}ms |
-| P99 | {min(r['p99_ms'] for r in results):.2f}ms | {sum(r['p99_ms'] for r in results)/len(results):.2f}ms | {max(r['p99_ms'] for r in results):.2f}ms |
-| Memory | {min(r['memory_mb'] for r in results):.1f}MB | {sum(r['memory_mb'] for r in results)/len(results):.1f}MB | {max(r['memory_mb'] for r in results):.1f}MB |
+| RPS | {agg['rps']['max']:,.0f} | {agg['rps']['avg']:,.0f} | {agg['rps']['min']:,.0f} |
+| Latency | {agg['latency_ms']['min']:.2f}ms | {agg['latency_ms']['avg']:.2f}ms | {agg['latency_ms']['max']:.2f}ms |
+| P99 | {agg['p99_ms']['min']:.2f}ms | {agg['p99_ms']['avg']:.2f}ms | {agg['p99_ms']['max']:.2f}ms |
+| Memory | {agg['memory_mb']['min']:.1f}MB | {agg['memory_mb']['avg']:.1f}MB | {agg['memory_mb']['max']:.1f}MB |
 
 **Best Performance:** {best['name']} with {int(best['rps']):,} RPS
-"""
+""")
+    summary = "".join(parts)
     
     # Write summary
     summary_file = output_dir / "summary.md"
-    summary_file.write_text(summary)
+    summary_file.write_text(summary, encoding="utf-8")
     
     return summary
 
@@ -353,16 +593,31 @@ def analyze_results(results):
         status = "OK" if r["errors"] == 0 else f"FAIL ({r['errors']})"
         print(f"{r['name']:<12} | {r['rps']:>12,.0f} | {r['latency']:>10} | {r['p99']:>10} | {r['memory_mb']:>8.1f}MB | {status}")
     
+    agg = aggregate(results)
     print(f"\n{'-'*60}")
-    print(f"Max RPS: {max(r['rps'] for r in results):,.0f}")
-    print(f"Avg RPS: {sum(r['rps'] for r in results)/len(results):,.0f}")
-    print(f"Max Memory: {max(r['memory_mb'] for r in results):.1f}MB")
+    print(f"Max RPS: {agg['rps']['max']:,.0f}")
+    print(f"Avg RPS: {agg['rps']['avg']:,.0f}")
+    print(f"Max Memory: {agg['memory_mb']['max']:.1f}MB")
     
     error_tests = [r["name"] for r in results if r["errors"] > 0]
     if error_tests:
         print(f"\n[WARNING] Tests with errors: {', '.join(error_tests)}")
     else:
         print("\n[OK] All tests passed without errors")
+    
+    co_run_tests = [r["name"] for r in results if r.get("co_run")]
+    if co_run_tests:
+        print(f"[WARNING] Co-run tests shared the client's CPUs: {', '.join(co_run_tests)}")
+
+def write_bytes(path, data):
+    """Write bytes to a file with raw os.write calls, bypassing buffered I/O"""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 def main():
     parser = argparse.ArgumentParser(description="MetaSSR Benchmark Suite")
@@ -371,6 +626,11 @@ def main():
     parser.add_argument("-o", "--output", default=".bench", help="Output directory")
     parser.add_argument("-s", "--skip-build", action="store_true", help="Skip building")
     parser.add_argument("--analyze-only", metavar="FILE", help="Only analyze existing results.json")
+    parser.add_argument("--parallel-scenarios", nargs="+", default=[], metavar="GROUP=URL",
+                        type=parse_group_target,
+                        help="Run a scenario group against its own server, alongside the rest; "
+                             "wrk for every lane runs on this machine, so use servers on other hosts "
+                             "and expect co-run numbers to differ from serial ones")
     args = parser.parse_args()
     
     # Handle analyze-only mode
@@ -425,17 +685,40 @@ def main():
     else:
         log("Could not find server PID, memory monitoring disabled")
     
+    # Servers for scenario groups that co-run with the rest; each must be its own
+    group_targets = {}
+    server_addr = urlparse(server_url)
+    seen_addrs = {(server_addr.hostname, server_addr.port)}
+    seen_pids = {server_pid}
+    for group, url in args.parallel_scenarios:
+        addr = urlparse(url)
+        if group in group_targets or (addr.hostname, addr.port) in seen_addrs:
+            error(f"Group '{group}' at {url} must have a server of its own")
+            sys.exit(1)
+        seen_addrs.add((addr.hostname, addr.port))
+        if not wait_for_server(url):
+            sys.exit(1)
+        # Only local servers have a PID to sample; a remote port may match a local process
+        pid = get_server_pid(addr.port) if addr.hostname in LOCAL_HOSTS else None
+        if pid and pid in seen_pids:
+            error(f"Group '{group}' at {url} is served by a process another target uses")
+            sys.exit(1)
+        seen_pids.add(pid)
+        if pid:
+            log(f"Monitoring '{group}' server process (PID: {pid})")
+        else:
+            log(f"No local PID for '{group}' server, memory monitoring disabled for it")
+        group_targets[group] = (url, pid)
+    
     # Warmup
     log("Warming up server...")
-    for _ in range(5):
-        subprocess.run(["curl", "-s", server_url], capture_output=True)
+    warmup(server_url)
+    for url, _ in group_targets.values():
+        warmup(url)
     time.sleep(2)
     
     # Run benchmarks
-    results = []
-    for name, threads, connections, duration in SCENARIOS:
-        result = run_test(name, threads, connections, duration, server_url, server_pid)
-        results.append(result)
+    results = run_scenarios(server_url, server_pid, group_targets)
     
     # Save JSON results
     results_data = {
@@ -445,7 +728,7 @@ def main():
         "tests": results
     }
     results_file = output_dir / "results.json"
-    results_file.write_text(json.dumps(results_data, indent=2))
+    write_bytes(results_file, json.dumps(results_data, separators=(",", ":")).encode())
     
     # Generate summary
     summary = generate_summary(results, output_dir, server_url, system_info)
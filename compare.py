@@ -2,20 +2,32 @@
 """MetaSSR vs Other Frameworks - Benchmark Comparison"""
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
 import platform
 import re
 import shutil
+import statistics
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
+
+try:
+    import orjson  # optional, faster report.json encoding
+except ImportError:
+    orjson = None
 
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_ROOT = SCRIPT_DIR
 COMPARE_DIR = SCRIPT_DIR / "apps"
+# Shared with benchmark.py: one entry per host holding CPU model and memory
+SYSINFO_CACHE_DIR = Path.home() / ".cache" / "metassr-bench"
 
 # Colors
 class C:
@@ -25,9 +37,17 @@ class C:
     B = '\033[0;34m'
     NC = '\033[0m'
 
-def log(msg): print(f"{C.B}[INFO]{C.NC} {msg}")
-def error(msg): print(f"{C.R}[ERROR]{C.NC} {msg}", file=sys.stderr)
-def success(msg): print(f"{C.G}[OK]{C.NC} {msg}")
+# Keep redirected output (e.g. CI logs) free of ANSI escapes
+if not sys.stdout.isatty():
+    C.R = C.G = C.Y = C.B = C.NC = ''
+
+_INFO = f"{C.B}[INFO]{C.NC}"
+_ERR = f"{C.R}[ERROR]{C.NC}"
+_OK = f"{C.G}[OK]{C.NC}"
+
+def log(msg): print(_INFO, msg)
+def error(msg): print(_ERR, msg, file=sys.stderr)
+def success(msg): print(_OK, msg)
 
 SCENARIOS = [
     ("Light",  1,  10,  5),
@@ -36,6 +56,16 @@ SCENARIOS = [
     ("Stress", 12, 500, 5),
 ]
 
+_RPS_RE = re.compile(r'Requests/sec:\s+([\d.]+)')
+_LAT_RE = re.compile(r'Latency\s+([\d.]+\w+)')
+_REQS_RE = re.compile(r'(\d+)\s+requests in')
+_ERR_RE = re.compile(r'Socket errors:.*?(\d+)')
+_LATVAL_RE = re.compile(r'([\d.]+)(\w+)')
+_MAX_LAT_RE = re.compile(r'Latency\s+[\d.]+\w+\s+[\d.]+\w+\s+([\d.]+\w+)')
+_DIST_RE = re.compile(r'^\s+(\d+)%\s+([\d.]+\w+)', re.M)
+_STAGE_RE = re.compile(r'^FROM\s+\S+\s+AS\s+(\S+)', re.M | re.I)
+_UNIT_MS = {'us': 1e-3, 'ms': 1, 's': 1e3}
+
 FRAMEWORKS = {
     "metassr": {
         "name": "MetaSSR",
@@ -56,101 +86,223 @@ FRAMEWORKS = {
 # --- helpers ---
 
 def check_deps(use_docker):
-    missing = []
-    for dep in ["wrk", "curl"]:
-        if subprocess.run(["which", dep], capture_output=True).returncode != 0:
-            missing.append(dep)
-    if use_docker:
-        if subprocess.run(["which", "docker"], capture_output=True).returncode != 0:
-            missing.append("docker")
+    deps = ["wrk"] + (["docker"] if use_docker else [])
+    missing = [d for d in deps if shutil.which(d) is None]
     if missing:
         error(f"Missing: {', '.join(missing)}")
         sys.exit(1)
 
-def wait_for(url, timeout=60):
-    for _ in range(timeout):
+async def wait_for_async(host, port, timeout, path="/"):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode()
+    delay = 0.02
+    # Each step is capped by the time left, so the call never overruns timeout
+    while (left := deadline - loop.time()) > 0:
         try:
-            r = subprocess.run(["curl", "-s", "--max-time", "2", url], capture_output=True)
-            if r.returncode == 0:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), min(0.5, left))
+            try:
+                # Docker's port proxy accepts connections before the app is up,
+                # so only an HTTP status line counts as ready
+                writer.write(request)
+                status = await asyncio.wait_for(reader.readline(), min(2, deadline - loop.time()))
+            finally:
+                writer.close()
+            if status.startswith(b"HTTP/"):
                 return True
-        except:
+        except (OSError, asyncio.TimeoutError):
             pass
-        time.sleep(1)
+        await asyncio.sleep(max(0, min(delay, deadline - loop.time())))
+        delay = min(delay * 1.5, 0.2)
     return False
 
+def wait_for(url, timeout=60):
+    u = urlparse(url)
+    return asyncio.run(wait_for_async(u.hostname, u.port or 80, timeout, u.path or "/"))
+
 def parse_latency_ms(s):
     if not s:
         return 0
-    m = re.match(r'([\d.]+)(\w+)', s)
+    m = _LATVAL_RE.match(s)
     if not m:
         return 0
-    v, u = float(m.group(1)), m.group(2).lower()
-    if u == 'us': return v / 1000
-    if u == 'ms': return v
-    if u == 's': return v * 1000
-    return v
+    return float(m.group(1)) * _UNIT_MS.get(m.group(2).lower(), 1)
 
 def parse_wrk(output):
-    r = {"rps": 0, "latency": "0ms", "latency_ms": 0, "p99": "0ms", "p99_ms": 0, "requests": 0, "errors": 0}
-    m = re.search(r'Requests/sec:\s+([\d.]+)', output)
+    r = {"rps": 0, "latency": "0ms", "latency_ms": 0, "max": "0ms", "max_ms": 0,
+         "p50": "0ms", "p50_ms": 0, "p75": "0ms", "p75_ms": 0, "p90": "0ms", "p90_ms": 0,
+         "p99": "0ms", "p99_ms": 0, "requests": 0, "errors": 0}
+    m = _RPS_RE.search(output)
     if m: r["rps"] = float(m.group(1))
-    m = re.search(r'Latency\s+([\d.]+\w+)', output)
+    m = _LAT_RE.search(output)
     if m: r["latency"] = m.group(1); r["latency_ms"] = parse_latency_ms(m.group(1))
-    m = re.search(r'99%\s+([\d.]+\w+)', output)
-    if m: r["p99"] = m.group(1); r["p99_ms"] = parse_latency_ms(m.group(1))
-    m = re.search(r'(\d+)\s+requests in', output)
+    m = _MAX_LAT_RE.search(output)
+    if m: r["max"] = m.group(1); r["max_ms"] = parse_latency_ms(m.group(1))
+    # Full percentile table printed under --latency
+    i = output.find("Latency Distribution")
+    if i != -1:
+        for pct, val in _DIST_RE.findall(output, i):
+            r[f"p{pct}"] = val; r[f"p{pct}_ms"] = parse_latency_ms(val)
+    m = _REQS_RE.search(output)
     if m: r["requests"] = int(m.group(1))
-    m = re.search(r'Socket errors:.*?(\d+)', output)
+    m = _ERR_RE.search(output)
     if m: r["errors"] = int(m.group(1))
     return r
 
+def read_hardware_info():
+    """Read CPU model and total memory, which are fixed per host"""
+    # benchmark.py has an identical copy; both fill the shared sysinfo cache
+    hw = {"cpu": "Unknown", "memory_gb": 0}
+    
+    # Get CPU info
+    try:
+        if platform.system() == "Linux":
+            # The first processor block is enough; the rest repeat it
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        hw["cpu"] = line.split(":", 1)[1].strip()
+                        break
+        elif platform.system() == "Darwin":
+            result = subprocess.run(["sysctl", "-n", "machdep.cpu.brand_string"], 
+                                   capture_output=True, text=True)
+            if result.returncode == 0:
+                hw["cpu"] = result.stdout.strip()
+    except:
+        pass
+    
+    # Get memory info
+    try:
+        if platform.system() == "Linux":
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        kb = int(line.split()[1])
+                        hw["memory_gb"] = round(kb / 1024 / 1024, 1)
+                        break
+        elif platform.system() == "Darwin":
+            result = subprocess.run(["sysctl", "-n", "hw.memsize"], 
+                                   capture_output=True, text=True)
+            if result.returncode == 0:
+                hw["memory_gb"] = round(int(result.stdout.strip()) / 1024 / 1024 / 1024, 1)
+    except:
+        pass
+    
+    return hw
+
+def valid_hardware_info(hw):
+    """Check that a cached sysinfo entry has the shape read_hardware_info returns"""
+    return (isinstance(hw, dict) and hw.keys() == {"cpu", "memory_gb"}
+            and isinstance(hw["cpu"], str) and isinstance(hw["memory_gb"], (int, float)))
+
 def get_system_info():
+    # Cores this process may run on, matching what benchmark.py reports
+    if hasattr(os, "sched_getaffinity"):
+        cpu_cores = len(os.sched_getaffinity(0))
+    else:
+        cpu_cores = os.cpu_count() or 0
     info = {
         "os": platform.system(), "os_version": platform.release(),
         "arch": platform.machine(), "cpu": "Unknown",
-        "cpu_cores": os.cpu_count() or 0, "memory_gb": 0,
+        "cpu_cores": cpu_cores, "memory_gb": 0,
     }
+    key = hashlib.sha1((platform.node() + platform.release()).encode()).hexdigest()
+    cache_file = SYSINFO_CACHE_DIR / f"sysinfo-{key}.json"
     try:
-        if platform.system() == "Linux":
-            for line in open("/proc/cpuinfo"):
-                if "model name" in line:
-                    info["cpu"] = line.split(":")[1].strip(); break
-            for line in open("/proc/meminfo"):
-                if "MemTotal" in line:
-                    info["memory_gb"] = round(int(line.split()[1]) / 1024 / 1024, 1); break
-    except:
-        pass
+        hw = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        hw = None
+    if not valid_hardware_info(hw):
+        hw = read_hardware_info()
+        if hw["cpu"] != "Unknown":
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(hw))
+            except OSError:
+                pass
+    info.update(hw)
     return info
 
+def cpu_split():
+    """Split usable CPUs into (server, wrk) taskset lists, or None if pinning is unavailable."""
+    if not hasattr(os, "sched_getaffinity") or shutil.which("taskset") is None:
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < 2:
+        return None
+    half = len(cpus) // 2
+    return ",".join(map(str, cpus[:half])), ",".join(map(str, cpus[half:]))
+
+def taskset(cpus):
+    return ["taskset", "-c", cpus] if cpus else []
+
+# --- build logs ---
+
+def run_logged(cmd, log_path, **kwargs):
+    """Run cmd, appending its stdout and stderr to log_path."""
+    with open(log_path, "ab") as f:
+        return subprocess.run(cmd, stdout=f, stderr=subprocess.STDOUT, **kwargs)
+
+def log_tail(log_path, size):
+    """Last size bytes of a build log, for error messages."""
+    return Path(log_path).read_bytes()[-size:].decode("utf-8", "replace")
+
 # --- docker ---
 
-def docker_build(fw_key):
+def is_registry_image(image):
+    """True if image names a registry host, e.g. ghcr.io/org/app or localhost:5000/app."""
+    first, sep, _ = image.partition("/")
+    return bool(sep) and ("." in first or ":" in first or first == "localhost")
+
+def docker_build(fw_key, log_dir):
     fw = FRAMEWORKS[fw_key]
     log(f"Building Docker image for {fw['name']}...")
+    log_path = log_dir / f"{fw_key}.build.log"
+    log_path.write_bytes(b"")
+    
+    # An image pushed to a registry seeds the layer cache; local-only tags
+    # would resolve to Docker Hub, so they rely on the local image instead
+    if is_registry_image(fw["docker_image"]):
+        subprocess.run(["docker", "pull", fw["docker_image"]], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    dockerfile = COMPARE_DIR / fw["dockerfile"]
+    try:
+        text = dockerfile.read_text()
+    except OSError as e:
+        error(f"Cannot read {dockerfile} for {fw['name']}: {e}")
+        return False
+    stages = {name.lower() for name in _STAGE_RE.findall(text)}
+    if "cargo build" in text and "planner" not in stages:
+        log(f"{fw['dockerfile']} builds Rust without a cargo-chef planner stage; "
+            "any source change recompiles all dependencies (see https://github.com/LukeMathWalker/cargo-chef)")
     
     cmd = [
         "docker", "build",
+        "--cache-from", fw["docker_image"],
+        "--build-arg", "BUILDKIT_INLINE_CACHE=1",
         "-t", fw["docker_image"],
-        "-f", str(COMPARE_DIR / fw["dockerfile"]),
+        "-f", str(dockerfile),
         str(COMPARE_DIR),
     ]
-    r = subprocess.run(cmd, capture_output=True, text=True)
+    r = run_logged(cmd, log_path, env={**os.environ, "DOCKER_BUILDKIT": "1"})
     
     if r.returncode != 0:
-        error(f"Docker build failed for {fw['name']}:\n{r.stderr[-500:]}")
+        error(f"Docker build failed for {fw['name']} (see {log_path}):\n{log_tail(log_path, 500)}")
         return False
     return True
 
-def docker_start(fw):
+def docker_start(fw, cpus=None):
     container = fw["docker_image"] + "-run"
-    subprocess.run(["docker", "rm", "-f", container], capture_output=True)
+    subprocess.run(["docker", "rm", "-f", container], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     log(f"Starting Docker container for {fw['name']} on port {fw['port']}...")
     cmd = [
         "docker", "run", "-d",
         "--name", container,
         "-p", f"{fw['port']}:{fw['port']}",
-        fw["docker_image"],
     ]
+    if cpus:
+        cmd += ["--cpuset-cpus", cpus]
+    cmd.append(fw["docker_image"])
     r = subprocess.run(cmd, capture_output=True, text=True)
     if r.returncode != 0:
         error(f"Docker start failed for {fw['name']}:\n{r.stderr}")
@@ -159,23 +311,25 @@ def docker_start(fw):
 
 def docker_stop(container):
     if container:
-        subprocess.run(["docker", "rm", "-f", container], capture_output=True)
+        subprocess.run(["docker", "rm", "-f", container], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 # --- local ---
 
-def local_build(fw_key):
+def local_build(fw_key, log_dir):
     """Build a framework app locally."""
     fw = FRAMEWORKS[fw_key]
     app_dir = COMPARE_DIR / fw["app_dir"]
+    log_path = log_dir / f"{fw_key}.build.log"
+    log_path.write_bytes(b"")
     
     if not app_dir.exists():
         error(f"App directory not found: {app_dir}")
         return False
     
     log(f"Installing {fw['name']} dependencies...")
-    r = subprocess.run(["npm", "install"], cwd=app_dir, capture_output=True, text=True)
+    r = run_logged(["npm", "install"], log_path, cwd=app_dir)
     if r.returncode != 0:
-        error(f"npm install failed for {fw['name']}:\n{r.stderr[-300:]}")
+        error(f"npm install failed for {fw['name']} (see {log_path}):\n{log_tail(log_path, 300)}")
         return False
 
     if fw_key == "metassr":
@@ -183,45 +337,45 @@ def local_build(fw_key):
         metassr_bin = shutil.which("metassr")
         if not metassr_bin:
             log("Building MetaSSR from source...")
-            r = subprocess.run(["cargo", "build", "--release"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+            r = run_logged(["cargo", "build", "--release"], log_path, cwd=PROJECT_ROOT)
             if r.returncode != 0:
-                error(f"MetaSSR build failed:\n{r.stderr[-300:]}")
+                error(f"MetaSSR build failed (see {log_path}):\n{log_tail(log_path, 300)}")
                 return False
         
         log("Building MetaSSR app...")
-        r = subprocess.run(["npm", "run", "build"], cwd=app_dir, capture_output=True, text=True)
+        r = run_logged(["npm", "run", "build"], log_path, cwd=app_dir)
         if r.returncode != 0:
-            error(f"MetaSSR app build failed:\n{r.stderr[-300:]}")
+            error(f"MetaSSR app build failed (see {log_path}):\n{log_tail(log_path, 300)}")
             return False
     elif fw_key == "nextjs":
         if not (app_dir / ".next").exists():
             log("Building Next.js app...")
-            r = subprocess.run(["npm", "run", "build"], cwd=app_dir, capture_output=True, text=True)
+            r = run_logged(["npm", "run", "build"], log_path, cwd=app_dir)
             if r.returncode != 0:
-                error(f"Next.js build failed:\n{r.stderr[-300:]}")
+                error(f"Next.js build failed (see {log_path}):\n{log_tail(log_path, 300)}")
                 return False
     
     return True
 
-def local_start(fw_key):
+def local_start(fw_key, cpus=None):
     """Start a framework server locally."""
     fw = FRAMEWORKS[fw_key]
     app_dir = COMPARE_DIR / fw["app_dir"]
     
     log(f"Starting {fw['name']} server on port {fw['port']}...")
     proc = subprocess.Popen(
-        ["npm", "start"], cwd=app_dir,
+        taskset(cpus) + ["npm", "start"], cwd=app_dir,
         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
     )
     return proc
 
 # --- benchmark ---
 
-def run_scenarios(url):
+def run_scenarios(url, cpus=None):
     results = []
     for name, threads, conns, dur in SCENARIOS:
         print(f"  {C.Y}[{name}]{C.NC} t={threads} c={conns} d={dur}s ... ", end="", flush=True)
-        cmd = ["wrk", f"-t{threads}", f"-c{conns}", f"-d{dur}s", "--latency", url]
+        cmd = taskset(cpus) + ["wrk", f"-t{threads}", f"-c{conns}", f"-d{dur}s", "--latency", url]
         r = subprocess.run(cmd, capture_output=True, text=True)
         m = parse_wrk(r.stdout + r.stderr)
         print(f"{m['rps']:.0f} RPS | {m['latency']} avg | {m['p99']} p99")
@@ -234,11 +388,26 @@ def pct_diff(a, b):
     if b == 0: return 0
     return ((a - b) / b) * 100
 
+GEO_MEAN_KEYS = ("rps", "latency_ms", "p99_ms")
+
+def geo_mean_diffs(a_runs, b_runs):
+    """Geometric-mean percent diffs of a over b per GEO_MEAN_KEYS, and how many scenarios fed them."""
+    # A zero on either side (e.g. a failed wrk run) has no ratio; drop that
+    # scenario from every metric so they all average the same set
+    pairs = [(a, b) for a, b in zip(a_runs, b_runs)
+             if all(a[k] > 0 and b[k] > 0 for k in GEO_MEAN_KEYS)]
+    if not pairs:
+        return None, 0
+    diffs = [(statistics.geometric_mean([a[k] / b[k] for a, b in pairs]) - 1) * 100
+             for k in GEO_MEAN_KEYS]
+    return diffs, len(pairs)
+
 def generate_report(all_results, output_dir, system_info, use_docker):
-    labels = ", ".join(f'"{s[0]}"' for s in SCENARIOS)
     fw_names = list(all_results.keys())
+    fw_display = {k: FRAMEWORKS[k]["name"] for k in fw_names}
+    scenario_names = [s[0] for s in SCENARIOS]
 
-    report = f"""# MetaSSR Framework Comparison
+    parts = [f"""# MetaSSR Framework Comparison
 
 **Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
 **Mode:** {"Docker containers" if use_docker else "Local processes"}
@@ -257,29 +426,34 @@ def generate_report(all_results, output_dir, system_info, use_docker):
 
 | Framework | Port | Mode |
 |-----------|------|------|
-"""
+"""]
     for k in fw_names:
-        report += f"| {FRAMEWORKS[k]['name']} | {FRAMEWORKS[k]['port']} | {'Docker' if use_docker else 'Local'} |\n"
+        parts.append(f"| {fw_display[k]} | {FRAMEWORKS[k]['port']} | {'Docker' if use_docker else 'Local'} |\n")
+
+    # Collect each metric per framework in one pass; charts and summary read from it
+    agg = {}
+    for fw_key in fw_names:
+        for r in all_results[fw_key]:
+            for k in ("rps", "latency_ms", "p50_ms", "p99_ms", "max_ms", "requests"):
+                agg.setdefault((fw_key, k), []).append(r[k])
 
     # --- charts ---
     for title, key, unit, fmt in [
         ("Requests per Second", "rps", "RPS", "d"),
         ("Average Latency", "latency_ms", "ms", ".2f"),
+        ("P50 Latency", "p50_ms", "ms", ".2f"),
         ("P99 Latency", "p99_ms", "ms", ".2f"),
+        ("Max Latency", "max_ms", "ms", ".2f"),
     ]:
-        max_val = 0
-        for fw_key in fw_names:
-            for r in all_results[fw_key]:
-                max_val = max(max_val, r[key])
-        max_val = max_val * 1.2
+        max_val = max(max(agg[(fw_key, key)]) for fw_key in fw_names) * 1.2
 
         # Build interleaved labels and values: "Light - MetaSSR", "Light - Next.js", ...
         combined_labels = []
         combined_vals = []
-        for s_idx, (sname, _, _, _) in enumerate(SCENARIOS):
+        for s_idx, sname in enumerate(scenario_names):
             for fw_key in fw_names:
-                combined_labels.append(f'"{sname} - {FRAMEWORKS[fw_key]["name"]}"')
-                combined_vals.append(all_results[fw_key][s_idx][key])
+                combined_labels.append(f'"{sname} - {fw_display[fw_key]}"')
+                combined_vals.append(agg[(fw_key, key)][s_idx])
 
         labels_str = ", ".join(combined_labels)
         if fmt == "d":
@@ -287,33 +461,33 @@ def generate_report(all_results, output_dir, system_info, use_docker):
         else:
             vals_str = ", ".join(f"{v:{fmt}}" for v in combined_vals)
 
-        report += f"\n## {title}\n\n"
-        report += f"```mermaid\nxychart-beta\n"
-        report += f'    title "{title}"\n'
-        report += f"    x-axis [{labels_str}]\n"
+        parts.append(f"\n## {title}\n\n")
+        parts.append(f"```mermaid\nxychart-beta\n")
+        parts.append(f'    title "{title}"\n')
+        parts.append(f"    x-axis [{labels_str}]\n")
         if fmt == "d":
-            report += f'    y-axis "{unit}" 0 --> {int(max_val)}\n'
+            parts.append(f'    y-axis "{unit}" 0 --> {int(max_val)}\n')
         else:
-            report += f'    y-axis "{unit}" 0 --> {max_val:{fmt}}\n'
-        report += f"    bar [{vals_str}]\n"
-        report += "```\n\n"
+            parts.append(f'    y-axis "{unit}" 0 --> {max_val:{fmt}}\n')
+        parts.append(f"    bar [{vals_str}]\n")
+        parts.append("```\n\n")
 
     # --- detailed tables per scenario ---
-    report += "## Detailed Results\n\n"
+    parts.append("## Detailed Results\n\n")
     for i, (sname, thr, conn, dur) in enumerate(SCENARIOS):
-        report += f"### {sname} Load (t={thr} c={conn} d={dur}s)\n\n"
-        report += "| Framework | RPS | Avg Latency | P99 Latency | Requests | Errors |\n"
-        report += "|-----------|-----|-------------|-------------|----------|--------|\n"
+        parts.append(f"### {sname} Load (t={thr} c={conn} d={dur}s)\n\n")
+        parts.append("| Framework | RPS | Avg Latency | P50 | P75 | P90 | P99 | Max | Requests | Errors |\n")
+        parts.append("|-----------|-----|-------------|-----|-----|-----|-----|-----|----------|--------|\n")
         for fw_key in fw_names:
             r = all_results[fw_key][i]
             err = f"FAIL ({r['errors']})" if r["errors"] > 0 else "OK"
-            report += f"| {FRAMEWORKS[fw_key]['name']} | {int(r['rps']):,} | {r['latency']} | {r['p99']} | {r['requests']:,} | {err} |\n"
-        report += "\n"
+            parts.append(f"| {fw_display[fw_key]} | {int(r['rps']):,} | {r['latency']} | {r['p50']} | {r['p75']} | {r['p90']} | {r['p99']} | {r['max']} | {r['requests']:,} | {err} |\n")
+        parts.append("\n")
 
     # --- summary table ---
-    report += "## Summary\n\n"
-    report += "| Metric | " + " | ".join(FRAMEWORKS[k]["name"] for k in fw_names) + " |\n"
-    report += "|--------|" + "|".join("---" for _ in fw_names) + "|\n"
+    parts.append("## Summary\n\n")
+    parts.append("| Metric | " + " | ".join(fw_display[k] for k in fw_names) + " |\n")
+    parts.append("|--------|" + "|".join("---" for _ in fw_names) + "|\n")
 
     for label, key, fmt in [
         ("Avg RPS", "rps", ",.0f"),
@@ -323,45 +497,58 @@ def generate_report(all_results, output_dir, system_info, use_docker):
     ]:
         cells = []
         for fw_key in fw_names:
-            data = all_results[fw_key]
-            if key == "requests":
-                v = sum(r[key] for r in data)
-            else:
-                v = sum(r[key] for r in data) / len(data)
+            values = agg[(fw_key, key)]
+            v = sum(values) if key == "requests" else sum(values) / len(values)
             cells.append(f"{v:{fmt}}")
-        report += f"| {label} | " + " | ".join(cells) + " |\n"
+        parts.append(f"| {label} | " + " | ".join(cells) + " |\n")
 
     # --- head-to-head ---
     if "metassr" in all_results and len(fw_names) > 1:
-        report += "\n## Head-to-Head\n"
+        parts.append("\n## Head-to-Head\n")
         metassr_data = all_results["metassr"]
         for fw_key in fw_names:
             if fw_key == "metassr":
                 continue
             other_data = all_results[fw_key]
-            report += f"\n### MetaSSR vs {FRAMEWORKS[fw_key]['name']}\n\n"
-            report += "| Scenario | RPS Diff | Latency Diff | P99 Diff | Winner |\n"
-            report += "|----------|----------|-------------|----------|--------|\n"
-            for i, (sname, _, _, _) in enumerate(SCENARIOS):
+            parts.append(f"\n### MetaSSR vs {fw_display[fw_key]}\n\n")
+            parts.append("| Scenario | RPS Diff | Latency Diff | P99 Diff | Winner |\n")
+            parts.append("|----------|----------|-------------|----------|--------|\n")
+            for i, sname in enumerate(scenario_names):
                 m = metassr_data[i]
                 o = other_data[i]
                 rps_d = pct_diff(m["rps"], o["rps"])
                 lat_d = pct_diff(m["latency_ms"], o["latency_ms"])
                 p99_d = pct_diff(m["p99_ms"], o["p99_ms"])
                 # Winner: higher RPS is better, lower latency is better
-                rps_winner = "MetaSSR" if m["rps"] >= o["rps"] else FRAMEWORKS[fw_key]["name"]
-                report += f"| {sname} | {'+' if rps_d >= 0 else ''}{rps_d:.1f}% | {'+' if lat_d >= 0 else ''}{lat_d:.1f}% | {'+' if p99_d >= 0 else ''}{p99_d:.1f}% | {rps_winner} |\n"
-            report += "\nPositive RPS diff = MetaSSR faster. Negative latency diff = MetaSSR faster.\n"
+                rps_winner = "MetaSSR" if m["rps"] >= o["rps"] else fw_display[fw_key]
+                parts.append(f"| {sname} | {'+' if rps_d >= 0 else ''}{rps_d:.1f}% | {'+' if lat_d >= 0 else ''}{lat_d:.1f}% | {'+' if p99_d >= 0 else ''}{p99_d:.1f}% | {rps_winner} |\n")
+            # Geometric mean weighs each scenario's ratio equally regardless of scale
+            diffs, used = geo_mean_diffs(metassr_data, other_data)
+            total = len(scenario_names)
+            label = "**Geo-mean**" if used == total else f"**Geo-mean ({used}/{total})**"
+            if diffs is None:
+                parts.append(f"| {label} | n/a | n/a | n/a | n/a |\n")
+            else:
+                rps_d, lat_d, p99_d = diffs
+                rps_winner = "MetaSSR" if rps_d >= 0 else fw_display[fw_key]
+                parts.append(f"| {label} | {'+' if rps_d >= 0 else ''}{rps_d:.1f}% | {'+' if lat_d >= 0 else ''}{lat_d:.1f}% | {'+' if p99_d >= 0 else ''}{p99_d:.1f}% | {rps_winner} |\n")
+            parts.append("\nPositive RPS diff = MetaSSR faster. Negative latency diff = MetaSSR faster.\n")
+
+    report = "".join(parts)
 
     output_dir = output_dir / str(datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
     output_dir.mkdir(parents=True, exist_ok=True)
     (output_dir / "report.md").write_text(report)
-    (output_dir / "report.json").write_text(json.dumps({
+    payload = {
         "timestamp": datetime.now().isoformat(),
         "system": system_info,
         "mode": "docker" if use_docker else "local",
-        "frameworks": {k: all_results[k] for k in fw_names},
-    }, indent=2))
+        "frameworks": all_results,
+    }
+    if orjson:
+        (output_dir / "report.json").write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        (output_dir / "report.json").write_text(json.dumps(payload, indent=2))
 
     print(f"Reports Saved to {output_dir}")
     return report
@@ -376,6 +563,8 @@ def main():
     parser.add_argument("-o", "--output", default=".bench/apps", help="Output directory")
     parser.add_argument("-d", "--docker", action="store_true", help="Run servers in Docker containers")
     parser.add_argument("--skip-build", action="store_true", help="Skip build step (local mode)")
+    parser.add_argument("--pin-cpus", action="store_true",
+                        help="Pin servers and wrk to separate halves of the CPUs")
     args = parser.parse_args()
 
     print(f"{C.B}=== MetaSSR Framework Comparison ==={C.NC}")
@@ -385,11 +574,43 @@ def main():
     log(f"Mode: {'Docker' if args.docker else 'Local'}")
     log(f"Frameworks: {', '.join(FRAMEWORKS[f]['name'] for f in args.frameworks)}")
 
+    server_cpus = wrk_cpus = None
+    if args.pin_cpus:
+        split = cpu_split()
+        if split:
+            server_cpus, wrk_cpus = split
+            log(f"Pinning servers to CPUs {server_cpus}, wrk to CPUs {wrk_cpus}")
+        else:
+            log("CPU pinning unavailable (needs taskset and 2+ CPUs), running unpinned")
+
     output_dir = PROJECT_ROOT / args.output
     all_results = {}
     containers = []
     processes = []
 
+    # Phase 1: build. Builds are independent, so they run in parallel.
+    running = set()
+    to_build = []
+    for fw_key in args.frameworks:
+        fw = FRAMEWORKS[fw_key]
+        if args.docker:
+            to_build.append(fw_key)
+        elif wait_for(f"http://localhost:{fw['port']}", timeout=2):
+            log(f"{fw['name']} already running on port {fw['port']}")
+            running.add(fw_key)
+        elif not args.skip_build:
+            to_build.append(fw_key)
+
+    build = docker_build if args.docker else local_build
+    built = {}
+    if to_build:
+        log_dir = output_dir / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(to_build)) as ex:
+            futures = {k: ex.submit(build, k, log_dir) for k in to_build}
+        built = {k: f.result() for k, f in futures.items()}
+
+    # Phase 2: start and benchmark. Serial, so runs don't contend for CPU.
     try:
         for fw_key in args.frameworks:
             fw = FRAMEWORKS[fw_key]
@@ -397,26 +618,19 @@ def main():
 
             print(f"\n{C.B}--- {fw['name']} ---{C.NC}")
 
+            if not built.get(fw_key, True):
+                error(f"Skipping {fw['name']}")
+                continue
+
             if args.docker:
-                if not docker_build(fw_key):
-                    error(f"Skipping {fw['name']}")
-                    continue
-                container = docker_start(fw)
+                container = docker_start(fw, server_cpus)
                 if not container:
                     error(f"Skipping {fw['name']}")
                     continue
                 containers.append(container)
-            else:
-                # Check if already running
-                if wait_for(url, timeout=2):
-                    log(f"{fw['name']} already running on port {fw['port']}")
-                else:
-                    if not args.skip_build:
-                        if not local_build(fw_key):
-                            error(f"Skipping {fw['name']}")
-                            continue
-                    proc = local_start(fw_key)
-                    processes.append(proc)
+            elif fw_key not in running:
+                proc = local_start(fw_key, server_cpus)
+                processes.append(proc)
 
             log(f"Waiting for {fw['name']}...")
             if not wait_for(url, timeout=60):
@@ -424,12 +638,12 @@ def main():
                 continue
 
             log("Warming up...")
-            for _ in range(10):
-                subprocess.run(["curl", "-s", url], capture_output=True)
+            # A short wrk burst warms the same connection-reuse paths the scenarios measure
+            subprocess.run(taskset(wrk_cpus) + ["wrk", "-t2", "-c10", "-d1s", url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             time.sleep(2)
 
             log(f"Benchmarking {fw['name']}...")
-            all_results[fw_key] = run_scenarios(url)
+            all_results[fw_key] = run_scenarios(url, wrk_cpus)
             success(f"{fw['name']} benchmarks complete")
 
     finally: